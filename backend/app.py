@@ -1,13 +1,21 @@
 import os
+import re
+import asyncio
+import csv
 import json
+import random
+import hashlib
+import sqlite3
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
+from contextlib import closing
 from typing import Dict
 from datetime import datetime
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 import PyPDF2
 import io
 from dotenv import load_dotenv
@@ -30,6 +38,17 @@ load_dotenv(PROJECT_ROOT / ".env")
 # GMAIL_APP_PASSWORD="your_16_char_app_password"
 # GOOGLE_SHEETS_CREDENTIALS_FILE="path/to/credentials.json"
 # GOOGLE_SHEET_NAME="Resume Screening Results"
+# GEMINI_EXTRACTION_MODEL="gemini-2.5-flash"
+# GEMINI_EVALUATION_MODEL="gemini-2.5-pro"
+# GEMINI_ESCALATION_MODEL="gemini-2.5-pro"
+# RESULTS_DB_FILE="path/to/results.db"
+# NEAR_DUPLICATE_THRESHOLD="0.9"
+# NEAR_DUPLICATE_MODE="reuse"  # or "flag"
+# MAX_INFLIGHT_SCREENINGS="4"
+# MAX_QUEUED_SCREENINGS="16"
+# SCREENING_QUEUE_TIMEOUT="30"
+# RETRY_AFTER_SECONDS="10"
+# RESCORE_CONCURRENCY="4"
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GMAIL_EMAIL = os.getenv("GMAIL_EMAIL")
 GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
@@ -42,6 +61,35 @@ JOB_REQUIREMENTS_FILE = os.getenv(
     "JOB_REQUIREMENTS_FILE",
     str(CONFIG_DIR / "job_requirements.json"),
 )
+RESULTS_DB_FILE = os.getenv("RESULTS_DB_FILE", str(BASE_DIR / "data" / "results.db"))
+EXPORT_BATCH_SIZE = 500
+# Estimated Jaccard similarity at or above which a resume counts as a near-duplicate.
+# "reuse" returns the prior evaluation without new AI calls or emails when the email (or
+# name) matches the earlier submission; otherwise, and in "flag" mode, it only annotates.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+NEAR_DUPLICATE_MODE = os.getenv("NEAR_DUPLICATE_MODE", "reuse").lower()
+# Admission control for /upload_resume (per worker process)
+MAX_INFLIGHT_SCREENINGS = int(os.getenv("MAX_INFLIGHT_SCREENINGS", "4"))
+MAX_QUEUED_SCREENINGS = int(os.getenv("MAX_QUEUED_SCREENINGS", "16"))
+SCREENING_QUEUE_TIMEOUT = float(os.getenv("SCREENING_QUEUE_TIMEOUT", "30"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "10"))
+# Number of LLM re-evaluations POST /candidates/rescore runs at once
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", "4"))
+
+# --- Model Routing ---
+# Each AI stage runs on its own model. Extraction is simple field lookup, so it
+# defaults to a flash-class model; the pro model is reserved for evaluation and
+# for escalation when the cheaper model's output fails validation.
+EXTRACTION_MODEL = os.getenv("GEMINI_EXTRACTION_MODEL", "gemini-2.5-flash")
+EVALUATION_MODEL = os.getenv("GEMINI_EVALUATION_MODEL", "gemini-2.5-pro")
+ESCALATION_MODEL = os.getenv("GEMINI_ESCALATION_MODEL", "gemini-2.5-pro")
+# Extraction fields that trigger escalation when left as "Not found" or empty.
+# Email is left out: it is resolved locally, and a resume without one would always escalate.
+ESCALATE_ON_FIELDS = [
+    field.strip()
+    for field in os.getenv("GEMINI_ESCALATE_ON_FIELDS", "name,candidateSkills").split(",")
+    if field.strip()
+]
 
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY not found in .env file")
@@ -55,6 +103,90 @@ if not GMAIL_EMAIL or not GMAIL_APP_PASSWORD:
 from fastapi.middleware.cors import CORSMiddleware
 app = FastAPI(title="AI-Powered Resume Screening")
 
+
+# --- Admission Control ---
+# Registered before CORS so that rejections still carry CORS headers.
+class AdmissionController:
+    """
+    Caps concurrent screenings with a bounded wait queue. Requests beyond the
+    queue are rejected with 429 straight away; queued requests that are not
+    admitted within the timeout get 503. Both carry a Retry-After header.
+    The in_flight and queued counters are updated before any await, so requests
+    arriving in the same event-loop tick are still counted against the limits.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self) -> None:
+        """Waits for a screening slot or raises HTTPException when saturated."""
+        headers = {"Retry-After": str(self.retry_after)}
+        if self.in_flight + self.queued >= self.max_in_flight + self.max_queued:
+            self.rejected_queue_full += 1
+            raise HTTPException(status_code=429, detail="Too many resumes in progress. Please retry later.", headers=headers)
+        if self.in_flight < self.max_in_flight and not self.queued:
+            # Free slot and nobody waiting: the semaphore has a permit, take it without a timeout
+            self.in_flight += 1
+            self.admitted += 1
+            await self.semaphore.acquire()
+            return
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise HTTPException(status_code=503, detail="Screening queue timed out. Please retry later.", headers=headers)
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Frees a screening slot taken by acquire()."""
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'max_in_flight': self.max_in_flight,
+            'max_queued': self.max_queued,
+            'admitted': self.admitted,
+            'rejected_queue_full': self.rejected_queue_full,
+            'rejected_timeout': self.rejected_timeout,
+        }
+
+
+admission = AdmissionController(
+    MAX_INFLIGHT_SCREENINGS, MAX_QUEUED_SCREENINGS, SCREENING_QUEUE_TIMEOUT, RETRY_AFTER_SECONDS,
+)
+
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Applies admission control to uploads before their body is read into memory."""
+    if request.method != "POST" or request.url.path != "/upload_resume":
+        return await call_next(request)
+    try:
+        await admission.acquire()
+    except HTTPException as e:
+        return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+    try:
+        return await call_next(request)
+    finally:
+        admission.release()
+
+
 # --- CORS Configuration ---
 app.add_middleware(
     CORSMiddleware,
@@ -222,14 +354,611 @@ def save_to_google_sheets(candidate_data: dict) -> bool:
         return False
 
 
+# --- Results Store ---
+RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_title TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    final_score REAL NOT NULL DEFAULT 0,
+    skill_score REAL,
+    experience_score REAL,
+    education_score REAL,
+    candidate_data TEXT,
+    evaluation TEXT NOT NULL,
+    requirements TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_job_score
+    ON evaluations (job_title, final_score DESC, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_created_at ON evaluations (created_at);
+CREATE TABLE IF NOT EXISTS evaluation_skills (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations (id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (skill, evaluation_id)
+);
+CREATE TABLE IF NOT EXISTS resume_signatures (
+    evaluation_id INTEGER PRIMARY KEY REFERENCES evaluations (id) ON DELETE CASCADE,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations (id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, evaluation_id)
+);
+"""
+_results_db_ready = False
+
+
+def get_results_db() -> sqlite3.Connection:
+    """Opens the local results database, creating the schema on first use."""
+    global _results_db_ready
+    if not _results_db_ready:
+        Path(RESULTS_DB_FILE).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(RESULTS_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    if not _results_db_ready:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(RESULTS_SCHEMA)
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(evaluations)")}
+        if 'requirements' not in columns:
+            # Databases created before re-scoring support lack the requirements snapshot
+            conn.execute("ALTER TABLE evaluations ADD COLUMN requirements TEXT")
+        _results_db_ready = True
+    return conn
+
+
+def numeric_score(evaluation: dict, field: str):
+    """Returns a score field as a number, or None if the model left it non-numeric."""
+    value = evaluation.get(field)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def write_matched_skills(conn: sqlite3.Connection, evaluation_id: int, evaluation: dict) -> None:
+    """Replaces the indexed matched skills of a stored evaluation."""
+    matched_skills = evaluation.get('matchedSkills') or []
+    if not isinstance(matched_skills, list):
+        matched_skills = [matched_skills]
+    conn.execute("DELETE FROM evaluation_skills WHERE evaluation_id = ?", (evaluation_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO evaluation_skills (evaluation_id, skill) VALUES (?, ?)",
+        [(evaluation_id, str(skill).strip().lower()) for skill in matched_skills if str(skill).strip()],
+    )
+
+
+def save_evaluation(job_title: str, candidate_data: dict, evaluation: dict, requirements: dict = None):
+    """
+    Records a final evaluation (and the extraction and job requirements it was
+    scored from) in the local results store. Returns the new row id, or None if
+    the write failed.
+    """
+    try:
+        with closing(get_results_db()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO evaluations (
+                    job_title, name, email, final_score, skill_score, experience_score,
+                    education_score, candidate_data, evaluation, requirements, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job_title,
+                    evaluation.get('name'),
+                    evaluation.get('email'),
+                    numeric_score(evaluation, 'finalScore') or 0,
+                    numeric_score(evaluation, 'skillScore'),
+                    numeric_score(evaluation, 'experienceScore'),
+                    numeric_score(evaluation, 'educationScore'),
+                    json.dumps(candidate_data),
+                    json.dumps(evaluation),
+                    json.dumps(requirements) if requirements is not None else None,
+                    datetime.now().isoformat(timespec='seconds'),
+                ),
+            )
+            write_matched_skills(conn, cursor.lastrowid, evaluation)
+            return cursor.lastrowid
+    except sqlite3.Error as e:
+        print(f"❌ Failed to save evaluation to results store: {e}")
+        return None
+
+
+def update_evaluation(evaluation_id: int, evaluation: dict, requirements: dict) -> bool:
+    """Overwrites a stored evaluation after re-scoring. Returns True on success."""
+    try:
+        with closing(get_results_db()) as conn, conn:
+            conn.execute(
+                """
+                UPDATE evaluations
+                SET name = ?, email = ?, final_score = ?, skill_score = ?, experience_score = ?,
+                    education_score = ?, evaluation = ?, requirements = ?
+                WHERE id = ?
+                """,
+                (
+                    evaluation.get('name'),
+                    evaluation.get('email'),
+                    numeric_score(evaluation, 'finalScore') or 0,
+                    numeric_score(evaluation, 'skillScore'),
+                    numeric_score(evaluation, 'experienceScore'),
+                    numeric_score(evaluation, 'educationScore'),
+                    json.dumps(evaluation),
+                    json.dumps(requirements),
+                    evaluation_id,
+                ),
+            )
+            write_matched_skills(conn, evaluation_id, evaluation)
+            return True
+    except sqlite3.Error as e:
+        print(f"❌ Failed to update evaluation {evaluation_id}: {e}")
+        return False
+
+
+def evaluations_query(job_title: str, skill: str = None, limit: int = None, offset: int = 0) -> tuple:
+    """Builds the (sql, params) ranking stored evaluations for a job, highest final score first."""
+    sql = "SELECT e.* FROM evaluations e"
+    params = []
+    if skill:
+        sql += " JOIN evaluation_skills s ON s.evaluation_id = e.id AND s.skill = ?"
+        params.append(skill.strip().lower())
+    sql += " WHERE e.job_title = ? ORDER BY e.final_score DESC, e.created_at DESC, e.id DESC"
+    params.append(job_title)
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return sql, params
+
+
+def query_evaluations(job_title: str, skill: str = None, limit: int = None, offset: int = 0):
+    """Yields stored evaluations for a job, highest final score first."""
+    with closing(get_results_db()) as conn:
+        yield from conn.execute(*evaluations_query(job_title, skill, limit, offset))
+
+
+def count_evaluations(job_title: str, skill: str = None) -> int:
+    """Counts stored evaluations for a job, optionally filtered by a matched skill."""
+    sql = "SELECT COUNT(*) FROM evaluations e"
+    params = []
+    if skill:
+        sql += " JOIN evaluation_skills s ON s.evaluation_id = e.id AND s.skill = ?"
+        params.append(skill.strip().lower())
+    sql += " WHERE e.job_title = ?"
+    params.append(job_title)
+    with closing(get_results_db()) as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+
+# --- Near-Duplicate Detection ---
+# MinHash signatures over word shingles of the normalized resume text, banded into
+# an LSH index so lookups only compare against resumes sharing at least one band.
+# 16 bands of 4 rows surface pairs from roughly 0.5 Jaccard similarity upwards.
+SHINGLE_SIZE = 3
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+# Each "permutation" XORs the 64-bit shingle hashes with a fixed random mask,
+# which keeps the per-permutation minimum inside a C-level map() call.
+_minhash_rng = random.Random(1729)
+MINHASH_MASKS = [_minhash_rng.getrandbits(64) for _ in range(MINHASH_BANDS * MINHASH_ROWS)]
+NORMALIZE_RE = re.compile(r"[^a-z0-9@.+]+")
+
+
+def compute_minhash(resume_text: str) -> list:
+    """Computes the MinHash signature of a resume's normalized word shingles."""
+    words = NORMALIZE_RE.sub(" ", resume_text.lower()).split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+    return [min(map(mask.__xor__, hashes)) for mask in MINHASH_MASKS]
+
+
+def lsh_bands(signature: list) -> list:
+    """Splits a signature into (band, bucket key) pairs for the LSH index."""
+    return [
+        (band, hashlib.blake2b(
+            repr(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]).encode(), digest_size=8,
+        ).hexdigest())
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def minhash_similarity(first: list, second: list) -> float:
+    """Estimates Jaccard similarity as the fraction of matching MinHash values."""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def save_signature(evaluation_id: int, signature: list) -> None:
+    """Indexes a stored evaluation's resume signature for near-duplicate lookups."""
+    try:
+        with closing(get_results_db()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resume_signatures (evaluation_id, signature) VALUES (?, ?)",
+                (evaluation_id, json.dumps(signature)),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO lsh_buckets (band, bucket, evaluation_id) VALUES (?, ?, ?)",
+                [(band, bucket, evaluation_id) for band, bucket in lsh_bands(signature)],
+            )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to index resume signature: {e}")
+
+
+def find_near_duplicate(job_title: str, signature: list):
+    """
+    Looks up the most similar previously evaluated resume for the same job.
+    Returns (evaluation row, similarity) when it reaches NEAR_DUPLICATE_THRESHOLD,
+    otherwise (None, 0.0).
+    """
+    bands = lsh_bands(signature)
+    # Start from the bucket index (one primary-key probe per band) and only then
+    # join evaluations; CROSS JOIN stops SQLite from scanning every row of the job.
+    candidates = " UNION ".join("SELECT evaluation_id FROM lsh_buckets WHERE band = ? AND bucket = ?" for _ in bands)
+    params = [value for pair in bands for value in pair] + [job_title]
+    try:
+        with closing(get_results_db()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT c.evaluation_id, r.signature
+                FROM ({candidates}) c
+                CROSS JOIN evaluations e
+                CROSS JOIN resume_signatures r
+                WHERE e.id = c.evaluation_id AND r.evaluation_id = c.evaluation_id AND e.job_title = ?
+                """,
+                params,
+            ).fetchall()
+            best_id, best_similarity = None, 0.0
+            for row in rows:
+                similarity = minhash_similarity(signature, json.loads(row['signature']))
+                if similarity > best_similarity:
+                    best_id, best_similarity = row['evaluation_id'], similarity
+            if best_similarity < NEAR_DUPLICATE_THRESHOLD:
+                return None, 0.0
+            best_row = conn.execute("SELECT * FROM evaluations WHERE id = ?", (best_id,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"❌ Near-duplicate lookup failed: {e}")
+        return None, 0.0
+    return best_row, best_similarity
+
+
+def is_same_candidate(row: sqlite3.Row, resume_text: str) -> bool:
+    """
+    Checks that a near-duplicate match belongs to the same person, by the email
+    (or failing that, the name) found locally in the new resume.
+    """
+    local_fields = extract_local_fields(resume_text)
+    email, name = local_fields['email'], local_fields['name']
+    if not is_unresolved(email):
+        return str(row['email'] or '').strip().lower() == email.lower()
+    if not is_unresolved(name):
+        return str(row['name'] or '').strip().lower() == name.lower()
+    return False
+
+
+def lookup_near_duplicate(job_title: str, resume_text: str) -> tuple:
+    """
+    Computes a resume's signature and looks up its nearest stored duplicate.
+    Returns (signature, row, similarity, same_candidate).
+    """
+    signature = compute_minhash(resume_text)
+    duplicate, similarity = find_near_duplicate(job_title, signature)
+    same_candidate = duplicate is not None and is_same_candidate(duplicate, resume_text)
+    return signature, duplicate, similarity, same_candidate
+
+
+# --- Local Field Extraction ---
+# Precompiled patterns for fields that can be read straight off the resume text,
+# so the LLM only has to resolve what these heuristics could not.
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,5})[\s.-]?\d{3,5}(?:[\s.-]?\d{3,4})?(?!\w)")
+YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+EXPLICIT_EXPERIENCE_RE = re.compile(
+    r"(\d{1,2}(?:\.\d)?)\s*(\+)?\s*(?:years?|yrs?)\s+(?:of\s+)?"
+    r"(?:professional\s+|work\s+|industry\s+|relevant\s+)?experience",
+    re.IGNORECASE,
+)
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*,?\s*\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"({_DATE})\s*(?:-|\u2013|\u2014|to|till|until)\s*({_DATE}|present|current|now|today|date)",
+    re.IGNORECASE,
+)
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+# Degree keywords, highest level first. Bare "master"/"bachelor" and short forms
+# like "BE"/"MS" only count when followed by "of"/"in", so job titles such as
+# "Scrum Master" and ordinary words such as "be." are not read as degrees.
+DEGREE_PATTERNS = [
+    ("Doctorate", re.compile(r"\b(ph\.\s?d\b\.?|phd\b|doctorate\b|doctor of\b)", re.IGNORECASE)),
+    ("Master's", re.compile(
+        r"(?<!scrum )\b(master'?s\b|master(?= (?:of|in)\b)|m\.\s?tech\b|mtech\b|m\.\s?sc\b|msc\b|m\.s\.|ms(?= in\b)|"
+        r"mba\b|mca\b|m\.e\.|me(?= in\b))",
+        re.IGNORECASE,
+    )),
+    ("Bachelor's", re.compile(
+        r"\b(bachelor'?s\b|bachelor(?= (?:of|in)\b)|b\.\s?tech\b|btech\b|b\.\s?sc\b|bsc\b|b\.s\.|bs(?= in\b)|"
+        r"bca\b|b\.e\.|be(?= in\b)|b\.a\.|ba(?= in\b))",
+        re.IGNORECASE,
+    )),
+    ("Associate", re.compile(r"\bassociate'?s? (degree|of)\b", re.IGNORECASE)),
+    ("Diploma", re.compile(r"\bdiploma\b", re.IGNORECASE)),
+]
+EDUCATION_LINE_RE = re.compile(r"\b(university|college|school|institute|academy)\b", re.IGNORECASE)
+# Short lines that open a resume section; the first group tells education apart
+SECTION_HEADING_RE = re.compile(
+    r"^\W*(?:(education|academics?|academic (?:background|qualifications?)|qualifications?)|"
+    r"(?:work |professional |employment )?(?:experience|history)|employment|projects?|"
+    r"(?:technical |key )?skills|certifications?|awards|achievements|publications|summary|profile|"
+    r"(?:career )?objective|interests|languages|references|volunteering)\W*$",
+    re.IGNORECASE,
+)
+NAME_LINE_RE = re.compile(r"^[A-Z][a-zA-Z'.-]*(?: [A-Z][a-zA-Z'.-]*){1,3}$")
+NAME_STOPWORDS = {
+    'resume', 'curriculum', 'vitae', 'cv', 'profile', 'summary', 'contact', 'objective',
+    'career', 'experience', 'education', 'skills', 'engineer', 'developer', 'manager',
+    'analyst', 'designer', 'consultant', 'intern', 'senior', 'junior', 'lead',
+}
+
+
+def parse_resume_date(text: str, today: datetime):
+    """
+    Parses a resume date ("Jan 2020", "01/2020", "2020", "Present") into (year, month).
+    Returns None for an invalid month such as "13/2020".
+    """
+    text = text.strip().lower()
+    if text in ('present', 'current', 'now', 'today', 'date'):
+        return today.year, today.month
+    year = int(re.search(r"\d{4}", text).group())
+    month = int(text.split('/')[0]) if '/' in text else MONTHS.get(text[:3], 1)
+    if not 1 <= month <= 12:
+        return None
+    return year, month
+
+
+def extract_explicit_experience(resume_text: str) -> str:
+    """Reads an explicit "N years of experience" statement, or returns "Not found"."""
+    explicit = EXPLICIT_EXPERIENCE_RE.search(resume_text)
+    if explicit:
+        return f"{explicit.group(1)}{explicit.group(2) or ''} years"
+    return "Not found"
+
+
+def non_education_lines(resume_text: str):
+    """
+    Yields the resume lines that are not about education: everything inside an
+    Education section (up to the next heading) is skipped, as are degree or
+    school lines elsewhere and the line right after them, where dates often sit.
+    """
+    in_education = False
+    after_education_line = False
+    for line in resume_text.splitlines():
+        heading = SECTION_HEADING_RE.match(line.strip())
+        if heading:
+            in_education = bool(heading.group(1))
+            after_education_line = False
+            continue
+        is_education_line = bool(EDUCATION_LINE_RE.search(line) or any(p.search(line) for _, p in DEGREE_PATTERNS))
+        if not (in_education or is_education_line or after_education_line):
+            yield line
+        after_education_line = is_education_line
+
+
+def estimate_experience_from_dates(resume_text: str, today: datetime = None) -> str:
+    """
+    Sums the (merged) date ranges outside education into total years. This is
+    only an estimate, so it is handed to the LLM as a hint rather than used as
+    the resolved experience. Returns "Not found" when no ranges are present.
+    """
+    today = today or datetime.now()
+    now_index = today.year * 12 + today.month
+    intervals = []
+    for line in non_education_lines(resume_text):
+        for match in DATE_RANGE_RE.finditer(line):
+            start_date = parse_resume_date(match.group(1), today)
+            end_date = parse_resume_date(match.group(2), today)
+            if start_date is None or end_date is None:
+                continue
+            (start_year, start_month), (end_year, end_month) = start_date, end_date
+            start = start_year * 12 + start_month
+            end = end_year * 12 + end_month
+            if start_year < 1950 or end < start or end > now_index:
+                continue
+            intervals.append((start, end))
+
+    if not intervals:
+        return "Not found"
+
+    # Merge overlapping roles so concurrent positions are not double-counted
+    intervals.sort()
+    total_months = 0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start <= current_end:
+            current_end = max(current_end, end)
+        else:
+            total_months += current_end - current_start
+            current_start, current_end = start, end
+    total_months += current_end - current_start
+
+    years = round(total_months / 12, 1)
+    return f"{years:g} years"
+
+
+def extract_local_education(resume_text: str) -> str:
+    """Returns the resume line naming the highest degree found, or "Not found"."""
+    for _, pattern in DEGREE_PATTERNS:
+        for line in resume_text.splitlines():
+            if pattern.search(line):
+                return line.strip()[:150]
+    return "Not found"
+
+
+def extract_local_phone(resume_text: str) -> str:
+    """Returns the first phone-like number with 10-15 digits that is not a run of years."""
+    for match in PHONE_RE.finditer(resume_text):
+        groups = re.findall(r"\d+", match.group())
+        if not 10 <= sum(len(group) for group in groups) <= 15:
+            continue
+        if len(groups) > 1 and all(len(group) == 4 and YEAR_RE.fullmatch(group) for group in groups):
+            continue
+        return match.group().strip()
+    return "Not found"
+
+
+def extract_local_name(resume_text: str) -> str:
+    """
+    Guesses the name from a short, title-cased line directly above or below the
+    email/phone line. Only used as a hint for the LLM, never as a resolved value.
+    """
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    contact = next(
+        (i for i, line in enumerate(lines[:10]) if EMAIL_RE.search(line) or not is_unresolved(extract_local_phone(line))),
+        None,
+    )
+    if contact is None:
+        return "Not found"
+    for index in (contact - 1, contact + 1):
+        if 0 <= index < len(lines):
+            line = lines[index]
+            if NAME_LINE_RE.match(line) and not NAME_STOPWORDS & set(line.lower().split()):
+                return line
+    return "Not found"
+
+
+def extract_local_fields(resume_text: str) -> dict:
+    """
+    Pulls the fields a regex/heuristic pass can resolve without the LLM:
+    email, phone, explicitly stated experience and highest degree, plus a name
+    guess and an experience estimate from date ranges for use as hints.
+    Unresolved fields are set to "Not found".
+    """
+    email = EMAIL_RE.search(resume_text)
+    return {
+        'name': extract_local_name(resume_text),
+        'email': email.group() if email else "Not found",
+        'phone': extract_local_phone(resume_text),
+        'experience': extract_explicit_experience(resume_text),
+        'experience_estimate': estimate_experience_from_dates(resume_text),
+        'education': extract_local_education(resume_text),
+    }
+
+
 # --- AI Interaction Functions ---
+def is_unresolved(value) -> bool:
+    """Returns True if an extracted field is missing, empty or "Not found"."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value.strip().lower() in ("not found", "n/a")
+    if isinstance(value, (list, dict)):
+        return len(value) == 0
+    return False
+
+
+def find_unresolved_fields(candidate_data: dict) -> list:
+    """Lists the escalation-critical extraction fields the model left unresolved."""
+    return [field for field in ESCALATE_ON_FIELDS if is_unresolved(candidate_data.get(field))]
+
+
+def find_invalid_scores(evaluation: dict) -> list:
+    """Lists the score fields of an evaluation that are missing or not numeric."""
+    invalid = []
+    for field in ('skillScore', 'experienceScore', 'educationScore', 'finalScore'):
+        value = evaluation.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            invalid.append(field)
+    return invalid
+
+
+async def generate_json(model_name: str, prompt: str, stage: str) -> dict:
+    """Runs a prompt on the given Gemini model and parses the JSON reply."""
+    genai.configure(api_key=GOOGLE_API_KEY)
+    model = genai.GenerativeModel(model_name)
+    try:
+        response = await model.generate_content_async(prompt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gemini API error during {stage}: {e}")
+    result = clean_json_response(response.text)
+    if not isinstance(result, dict):
+        raise HTTPException(status_code=500, detail="AI response was not a JSON object.")
+    return result
+
+
+async def generate_with_escalation(stage: str, prompt: str, model_name: str, validator) -> dict:
+    """
+    Runs a prompt on the stage's model and retries on ESCALATION_MODEL when the
+    reply cannot be parsed or the validator reports problem fields.
+    Fields the bigger model still leaves unresolved fall back to the first answer.
+    """
+    try:
+        result = await generate_json(model_name, prompt, stage)
+        problems = validator(result)
+    except HTTPException as e:
+        result, problems = None, [e.detail]
+
+    if not problems or model_name == ESCALATION_MODEL:
+        if result is None:
+            raise HTTPException(status_code=500, detail=problems[0])
+        return result
+
+    print(f"⬆️ Escalating {stage} from {model_name} to {ESCALATION_MODEL}: {problems}")
+    escalated = await generate_json(ESCALATION_MODEL, prompt, stage)
+    if result:
+        for field, value in result.items():
+            if is_unresolved(escalated.get(field)) and not is_unresolved(value):
+                escalated[field] = value
+    return escalated
+
+
+# Output format and instruction for each field the extraction prompt can ask for
+EXTRACTION_FIELDS = {
+    'name': ('"Exact name from resume"', 'Always use the exact name as written in the resume.'),
+    'email': ('"candidate\'s email address"', 'Extract the email address from the resume (e.g., "john.doe@gmail.com", "candidate@example.com").'),
+    'candidateSkills': ('["list", "of", "skills"]', 'Extract all skills mentioned in the resume and list them under "candidateSkills".'),
+    'experience': ('"Number of years or range"', 'Estimate experience from the text (e.g., "3 years", "6+ years").'),
+    'education': ('"Highest degree or education"', 'Identify the highest education level or degree mentioned.'),
+}
+
+
 async def extract_structured_data(resume_text: str) -> dict:
     """
     Uses Gemini to extract structured information from the resume text.
     (Corresponds to the first AI step in the n8n workflow)
+    Fields resolved locally by extract_local_fields are pre-filled and left out
+    of the prompt. The local name guess and the date-range experience estimate
+    are only passed along as hints, since headings and education dates are
+    easily misread. Runs on EXTRACTION_MODEL and escalates to ESCALATION_MODEL
+    when the output cannot be parsed or leaves key fields unresolved.
     """
-    genai.configure(api_key=GOOGLE_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-pro')
+    local_fields = extract_local_fields(resume_text)
+    candidate_data = {field: local_fields.get(field, "Not found") for field in EXTRACTION_FIELDS}
+    candidate_data['name'] = "Not found"
+    if not is_unresolved(local_fields['phone']):
+        candidate_data['phone'] = local_fields['phone']
+
+    pending = [field for field in EXTRACTION_FIELDS if is_unresolved(candidate_data[field])]
+    json_format = ",\n".join(f'      "{field}": {EXTRACTION_FIELDS[field][0]}' for field in pending)
+    instructions = [EXTRACTION_FIELDS[field][1] for field in pending]
+    if not is_unresolved(local_fields['name']):
+        instructions.append(
+            f'The name may be "{local_fields["name"]}"; use it only if that is how the candidate\'s name is written.'
+        )
+    if 'experience' in pending and not is_unresolved(local_fields['experience_estimate']):
+        instructions.append(
+            f'Work dates outside the education section add up to about {local_fields["experience_estimate"]}; '
+            'use this only if those dates are professional experience.'
+        )
+    instructions += [
+        "**Do not wrap the JSON in markdown or code blocks. Return only the JSON object itself.**",
+        'If a field is missing, use "Not found" or an empty array.',
+    ]
+    numbered = "\n".join(f"    {i}. {text}" for i, text in enumerate(instructions, 1))
     prompt = f"""
     Resume Text:
     {resume_text}
@@ -238,39 +967,33 @@ async def extract_structured_data(resume_text: str) -> dict:
 
     Return a clean JSON object in this format:
     {{
-      "name": "Exact name from resume",
-      "email": "candidate's email address",
-      "candidateSkills": ["list", "of", "skills"],
-      "experience": "Number of years or range",
-      "education": "Highest degree or education"
+{json_format}
     }}
 
     Instructions:
-    1. Always use the exact name as written in the resume.
-    2. Extract the email address from the resume (e.g., "john.doe@gmail.com", "candidate@example.com").
-    3. Extract all skills mentioned in the resume and list them under "candidateSkills".
-    4. Estimate experience from the text (e.g., "3 years", "6+ years").
-    5. Identify the highest education level or degree mentioned.
-    6. **Do not wrap the JSON in markdown or code blocks. Return only the JSON object itself.**
-    7. If a field is missing, use "Not found" or an empty array.
+{numbered}
     """
-    try:
-        response = await model.generate_content_async(prompt)
-        return clean_json_response(response.text)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gemini API error during data extraction: {e}")
 
+    def validator(data: dict) -> list:
+        return [field for field in find_unresolved_fields(data) if field in pending]
 
-async def evaluate_candidate(candidate_data: dict) -> dict:
+    extracted = await generate_with_escalation(
+        "data extraction", prompt, EXTRACTION_MODEL, validator,
+    )
+    for field in pending:
+        candidate_data[field] = extracted.get(field, [] if field == 'candidateSkills' else "Not found")
+    return candidate_data
+
+
+async def evaluate_candidate(candidate_data: dict, job_reqs: dict = None) -> dict:
     """
     Compares extracted resume data with job requirements to score the candidate.
     (Corresponds to the second AI step in the n8n workflow)
     """
-    genai.configure(api_key=GOOGLE_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-pro')
 
-    # Load job requirements from file
-    job_reqs = load_job_requirements()
+    # Load job requirements from file unless the caller already has them
+    job_reqs = job_reqs or load_job_requirements()
+    weights = apply_scoring_rules({}, job_reqs)['weights']
 
     # The candidate data is passed in the prompt context
     candidate_context = json.dumps(candidate_data, indent=2)
@@ -308,17 +1031,202 @@ async def evaluate_candidate(candidate_data: dict) -> dict:
       "finalScore": 0,
       "feedback": "Brief summary of candidate’s suitability",
       "weights": {{
-        "skills": 0.7,
-        "experience": 0.2,
-        "education": 0.1
+        "skills": {weights['skills']:g},
+        "experience": {weights['experience']:g},
+        "education": {weights['education']:g}
       }}
     }}
     """
-    try:
-        response = await model.generate_content_async(prompt)
-        return clean_json_response(response.text)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gemini API error during evaluation: {e}")
+    return await generate_with_escalation(
+        "evaluation", prompt, EVALUATION_MODEL, find_invalid_scores,
+    )
+
+
+# --- Incremental Re-scoring ---
+# Maps each score component to its key in the "scoring_weights" config
+SCORE_COMPONENTS = {
+    'skillScore': 'technical_skills',
+    'experienceScore': 'experience',
+    'educationScore': 'education',
+}
+DEFAULT_SCORING_WEIGHTS = {'technical_skills': 70, 'experience': 20, 'education': 10}
+DEFAULT_PASSING_SCORE = 50
+# Requirement aspects only the LLM can score: (score component, requirements key)
+LLM_SCORED_ASPECTS = {
+    'experience': ('experienceScore', 'minimum_experience_years'),
+    'education': ('educationScore', 'required_education'),
+}
+
+
+def normalize_skill(skill) -> str:
+    """Normalizes a skill name for matching ("Node.js" and "nodejs" compare equal)."""
+    return re.sub(r"[^a-z0-9+#]", "", str(skill).lower())
+
+
+def match_skills(candidate_skills: list, job_skills: list) -> tuple:
+    """Splits the job's skills into (matched, missing) against the candidate's skills."""
+    candidate = {normalize_skill(skill) for skill in candidate_skills or []}
+    matched = [skill for skill in job_skills if normalize_skill(skill) in candidate]
+    missing = [skill for skill in job_skills if normalize_skill(skill) not in candidate]
+    return matched, missing
+
+
+def job_skills(job_reqs: dict) -> list:
+    """The skill list a candidate is evaluated against, as sent to the evaluation prompt."""
+    return job_reqs.get("required_skills", []) + job_reqs.get("preferred_skills", [])
+
+
+def weighted_final_score(evaluation: dict, weights: dict) -> float:
+    """Combines the component scores using the configured percentage weights."""
+    total_weight = sum(weights.get(key, 0) for key in SCORE_COMPONENTS.values()) or 1
+    total = sum(
+        (numeric_score(evaluation, component) or 0) * weights.get(key, 0)
+        for component, key in SCORE_COMPONENTS.items()
+    )
+    return round(total / total_weight, 1)
+
+
+def apply_scoring_rules(evaluation: dict, job_reqs: dict) -> dict:
+    """
+    Sets finalScore, passed and weights from the component scores using the
+    configured scoring_weights and passing_score. Fresh uploads and re-scoring
+    both go through here so stored and re-scored rows follow the same rules.
+    """
+    weights = job_reqs.get("scoring_weights", DEFAULT_SCORING_WEIGHTS)
+    total_weight = sum(weights.get(key, 0) for key in SCORE_COMPONENTS.values()) or 1
+    evaluation['finalScore'] = weighted_final_score(evaluation, weights)
+    evaluation['passed'] = evaluation['finalScore'] >= job_reqs.get("passing_score", DEFAULT_PASSING_SCORE)
+    evaluation['weights'] = {
+        'skills': weights.get('technical_skills', 0) / total_weight,
+        'experience': weights.get('experience', 0) / total_weight,
+        'education': weights.get('education', 0) / total_weight,
+    }
+    return evaluation
+
+
+async def evaluate_and_score(candidate_data: dict, job_reqs: dict) -> dict:
+    """
+    Runs the LLM evaluation and settles the result the same way for fresh
+    uploads and re-scoring: the extracted email is used when the evaluation lost
+    it, and the final score and pass/fail come from apply_scoring_rules.
+    """
+    evaluation = await evaluate_candidate(candidate_data, job_reqs)
+    if is_unresolved(evaluation.get('email')) or '@' not in str(evaluation.get('email')):
+        evaluation['email'] = candidate_data.get('email', 'Not found')
+    return apply_scoring_rules(evaluation, job_reqs)
+
+
+def diff_requirements(old_reqs: dict, new_reqs: dict) -> set:
+    """Lists which scoring aspects differ between two job requirement snapshots."""
+    changes = set()
+    if old_reqs.get("scoring_weights", DEFAULT_SCORING_WEIGHTS) != new_reqs.get("scoring_weights", DEFAULT_SCORING_WEIGHTS):
+        changes.add('weights')
+    if old_reqs.get("passing_score", DEFAULT_PASSING_SCORE) != new_reqs.get("passing_score", DEFAULT_PASSING_SCORE):
+        changes.add('threshold')
+    if [normalize_skill(s) for s in job_skills(old_reqs)] != [normalize_skill(s) for s in job_skills(new_reqs)]:
+        changes.add('skills')
+    for aspect, (_, key) in LLM_SCORED_ASPECTS.items():
+        if old_reqs.get(key) != new_reqs.get(key):
+            changes.add(aspect)
+    return changes
+
+
+def rescore_evaluation(evaluation: dict, old_reqs: dict, new_reqs: dict) -> tuple:
+    """
+    Re-scores a stored evaluation for changed job requirements without the LLM.
+    Weights and threshold are applied directly; skill-list changes shift the skill
+    score by the change in local matcher coverage. Experience or education changes
+    cannot be scored locally, so they are bounded instead.
+    Returns (evaluation, changes, needs_llm) where needs_llm is True only when
+    those bounds leave the pass/fail outcome open.
+    """
+    changes = diff_requirements(old_reqs, new_reqs)
+    if not changes:
+        return evaluation, changes, False
+
+    rescored = dict(evaluation)
+    if 'skills' in changes:
+        candidate_skills = rescored.get('candidateSkills') or []
+        old_skills, new_skills = job_skills(old_reqs), job_skills(new_reqs)
+        old_matched, _ = match_skills(candidate_skills, old_skills)
+        new_matched, new_missing = match_skills(candidate_skills, new_skills)
+        old_coverage = len(old_matched) / len(old_skills) if old_skills else 0
+        new_coverage = len(new_matched) / len(new_skills) if new_skills else 0
+        skill_score = (numeric_score(rescored, 'skillScore') or 0) + (new_coverage - old_coverage) * 100
+        rescored.update({
+            'skillScore': round(min(100, max(0, skill_score)), 1),
+            'requiredSkills': new_skills,
+            'matchedSkills': new_matched,
+            'missingSkills': new_missing,
+        })
+
+    apply_scoring_rules(rescored, new_reqs)
+    weights = new_reqs.get("scoring_weights", DEFAULT_SCORING_WEIGHTS)
+    passing_score = new_reqs.get("passing_score", DEFAULT_PASSING_SCORE)
+
+    unknown = [component for aspect, (component, _) in LLM_SCORED_ASPECTS.items() if aspect in changes]
+    rescored['staleComponents'] = unknown
+    if not unknown:
+        return rescored, changes, False
+    lowest = weighted_final_score({**rescored, **{component: 0 for component in unknown}}, weights)
+    highest = weighted_final_score({**rescored, **{component: 100 for component in unknown}}, weights)
+    return rescored, changes, (lowest >= passing_score) != (highest >= passing_score)
+
+
+async def rescore_stored_evaluations(job_reqs: dict) -> dict:
+    """
+    Brings every stored evaluation for the job up to date with job_reqs.
+    Candidates are re-evaluated by the LLM (from their stored extraction) only
+    when local re-scoring cannot settle their outcome, with at most
+    RESCORE_CONCURRENCY re-evaluations running at once. Components that were not
+    recomputed keep their old requirement in the stored snapshot, so later runs
+    still see them as out of date. Returns run totals.
+    """
+    job_title = job_reqs.get("job_title", "Software Developer")
+    totals = {'total': 0, 'unchanged': 0, 'rescored_locally': 0, 'reevaluated': 0, 'outcome_changed': 0}
+    llm_slots = asyncio.Semaphore(max(1, RESCORE_CONCURRENCY))
+
+    async def rescore_row(row):
+        evaluation = json.loads(row['evaluation'])
+        previous_reqs = json.loads(row['requirements']) if row['requirements'] else None
+        if previous_reqs is None:
+            # No snapshot to diff against: only a full re-evaluation is trustworthy
+            rescored, changes, needs_llm = evaluation, {'unknown'}, True
+        else:
+            rescored, changes, needs_llm = rescore_evaluation(evaluation, previous_reqs, job_reqs)
+        if not changes:
+            totals['unchanged'] += 1
+            return
+
+        if needs_llm:
+            async with llm_slots:
+                rescored = await evaluate_and_score(json.loads(row['candidate_data'] or "{}"), job_reqs)
+            snapshot = job_reqs
+            totals['reevaluated'] += 1
+        else:
+            snapshot = dict(job_reqs)
+            for aspect, (_, key) in LLM_SCORED_ASPECTS.items():
+                if aspect in changes:
+                    if key in previous_reqs:
+                        snapshot[key] = previous_reqs[key]
+                    else:
+                        snapshot.pop(key, None)
+            totals['rescored_locally'] += 1
+
+        previous_passing = evaluation.get('passed')
+        if previous_passing is None:
+            previous_passing = (numeric_score(evaluation, 'finalScore') or 0) >= (previous_reqs or {}).get(
+                "passing_score", DEFAULT_PASSING_SCORE,
+            )
+        if previous_passing != rescored['passed']:
+            totals['outcome_changed'] += 1
+        rescored['candidate_id'] = row['id']
+        await asyncio.to_thread(update_evaluation, row['id'], rescored, snapshot)
+
+    rows = await asyncio.to_thread(lambda: list(query_evaluations(job_title)))
+    totals['total'] = len(rows)
+    await asyncio.gather(*(rescore_row(row) for row in rows))
+    return {'job_title': job_title, **totals}
 
 
 # --- API Endpoints ---
@@ -328,6 +1236,10 @@ async def root():
         "message": "AI-Powered Resume Screening API is running!",
         "endpoints": {
             "upload": "POST /upload_resume",
+            "candidates": "GET /candidates",
+            "export": "GET /candidates/export",
+            "rescore": "POST /candidates/rescore",
+            "admission": "GET /admission",
             "docs": "/docs"
         }
     }
@@ -343,17 +1255,67 @@ async def upload_resume(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF is supported.")
 
     file_bytes = await file.read()
+    return await screen_resume(file_bytes)
+
 
+async def screen_resume(file_bytes: bytes, notify: bool = True) -> dict:
+    """
+    Runs a PDF resume through the full screening workflow and returns the final
+    evaluation. With notify=False (used for dry runs of the bulk ingestion CLI)
+    nothing is persisted or sent: the results store, email and Google Sheets
+    steps are skipped, so a later real run records the candidate exactly once.
+    Blocking steps (PDF parsing, SQLite, SMTP, Sheets) run in worker threads so
+    concurrent screenings do not stall the event loop.
+    """
     # --- Workflow Step 1: Extract text from PDF ---
-    resume_text = extract_text_from_pdf(file_bytes)
+    resume_text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
     if not resume_text:
         raise HTTPException(status_code=400, detail="Could not extract text from the PDF. The file might be empty or image-based.")
 
+    # --- Workflow Step 1b: Short-circuit near-duplicates of earlier submissions ---
+    job_reqs = load_job_requirements()
+    job_title = job_reqs.get("job_title", "Software Developer")
+    # Hashing and the SQLite lookup are blocking, so keep them off the event loop
+    signature, duplicate, similarity, same_candidate = await asyncio.to_thread(
+        lookup_near_duplicate, job_title, resume_text,
+    )
+    if duplicate is not None:
+        print(f"♻️ Near-duplicate of evaluation {duplicate['id']} (similarity {similarity:.2f})")
+        # Only reuse a result for the same person; otherwise just flag the match
+        if NEAR_DUPLICATE_MODE == "reuse" and same_candidate:
+            prior_evaluation = json.loads(duplicate['evaluation'])
+            prior_evaluation.update({
+                'candidate_id': duplicate['id'],
+                'near_duplicate_of': duplicate['id'],
+                'similarity': round(similarity, 3),
+                'email_sent': False,
+                'email_recipient': None,
+            })
+            return prior_evaluation
+
     # --- Workflow Step 2: Extract structured data from text ---
     candidate_data = await extract_structured_data(resume_text)
 
     # --- Workflow Step 3: Evaluate candidate against job requirements ---
-    final_evaluation = await evaluate_candidate(candidate_data)
+    # Final score and pass/fail follow the configured scoring_weights and passing_score
+    final_evaluation = await evaluate_and_score(candidate_data, job_reqs)
+
+    if duplicate is not None:
+        final_evaluation['near_duplicate_of'] = duplicate['id']
+        final_evaluation['similarity'] = round(similarity, 3)
+
+    if not notify:
+        final_evaluation['candidate_id'] = None
+        final_evaluation['email_sent'] = False
+        final_evaluation['email_recipient'] = None
+        return final_evaluation
+
+    # --- Workflow Step 3b: Record the evaluation in the local results store ---
+    final_evaluation['candidate_id'] = await asyncio.to_thread(
+        save_evaluation, job_title, candidate_data, final_evaluation, job_reqs,
+    )
+    if final_evaluation['candidate_id'] is not None:
+        await asyncio.to_thread(save_signature, final_evaluation['candidate_id'], signature)
 
     # --- Workflow Step 4: Send email notification based on score ---
     candidate_name = final_evaluation.get('name', 'Candidate')
@@ -370,7 +1332,7 @@ async def upload_resume(file: UploadFile = File(...)):
     else:
         recipient_email = "rahultripathi2k4151@gmail.com"  # Send to HR if no candidate email
 
-    if final_score >= 50:
+    if final_evaluation['passed']:
         # Send offer/shortlist email
         subject = "🎉 Congratulations - You're Moving Forward!"
         body = f"""Dear {candidate_name},
@@ -414,22 +1376,118 @@ Best regards,
 Hiring Team"""
 
     # Send the email
-    email_sent = send_email(recipient_email, subject, body)
+    email_sent = await asyncio.to_thread(send_email, recipient_email, subject, body)
 
     # Add email status to response
     final_evaluation['email_sent'] = email_sent
     final_evaluation['email_recipient'] = recipient_email if email_sent else None
 
-    # --- Workflow Step 5: Save to Google Sheets if score >= 50 ---
+    # --- Workflow Step 5: Save to Google Sheets if the candidate passed ---
     sheets_saved = False
-    if final_score >= 50:
-        sheets_saved = save_to_google_sheets(final_evaluation)
+    if final_evaluation['passed']:
+        sheets_saved = await asyncio.to_thread(save_to_google_sheets, final_evaluation)
         final_evaluation['saved_to_sheets'] = sheets_saved
 
     return final_evaluation
 
+
+@app.get("/candidates")
+async def list_candidates(
+    job: str = None,
+    skill: str = None,
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Returns a page of the stored leaderboard for a job (defaults to the current
+    job title), ranked by final score and optionally filtered by a matched skill.
+    """
+    job_title = job or load_job_requirements().get("job_title", "Software Developer")
+    candidates = [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'email': row['email'],
+            'finalScore': row['final_score'],
+            'skillScore': row['skill_score'],
+            'experienceScore': row['experience_score'],
+            'educationScore': row['education_score'],
+            'matchedSkills': json.loads(row['evaluation']).get('matchedSkills', []),
+            'createdAt': row['created_at'],
+        }
+        for row in query_evaluations(job_title, skill, limit, offset)
+    ]
+    return {
+        'job_title': job_title,
+        'total': count_evaluations(job_title, skill),
+        'limit': limit,
+        'offset': offset,
+        'candidates': candidates,
+    }
+
+
+@app.get("/candidates/export")
+async def export_candidates(job: str = None, skill: str = None):
+    """
+    Streams the full leaderboard for a job as CSV in batches of EXPORT_BATCH_SIZE rows.
+    The generator is async so it stays on the event loop thread: a sync generator
+    would be advanced from arbitrary threadpool threads, which its SQLite
+    connection does not allow.
+    """
+    job_title = job or load_job_requirements().get("job_title", "Software Developer")
+
+    async def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([
+            'Rank', 'Name', 'Email', 'Final Score', 'Skill Score', 'Experience Score',
+            'Education Score', 'Matched Skills', 'Evaluated At',
+        ])
+        rank = 0
+        with closing(get_results_db()) as conn:
+            cursor = conn.execute(*evaluations_query(job_title, skill))
+            while True:
+                batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                for row in batch:
+                    rank += 1
+                    matched = json.loads(row['evaluation']).get('matchedSkills', [])
+                    writer.writerow([
+                        rank, row['name'], row['email'], row['final_score'], row['skill_score'],
+                        row['experience_score'], row['education_score'],
+                        ', '.join(matched) if isinstance(matched, list) else matched,
+                        row['created_at'],
+                    ])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                if not batch:
+                    return
+
+    filename = re.sub(r"[^A-Za-z0-9_-]+", "_", job_title).strip("_") or "candidates"
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+    )
+
+
+@app.post("/candidates/rescore")
+async def rescore_candidates():
+    """
+    Re-scores stored evaluations for the current job after job_requirements.json
+    changes, calling the LLM only for candidates whose outcome could flip.
+    """
+    return await rescore_stored_evaluations(load_job_requirements())
+
+
+@app.get("/admission")
+async def admission_stats():
+    """Reports in-flight and queued screenings plus rejection counts for this worker."""
+    return admission.stats()
+
 # To run the app now located in backend/:
 # 1. Create a file named .env at the project root.
 # 2. Add your Google API key to it: GOOGLE_API_KEY="your_key_here"
 # 3. Install requirements: pip install -r backend/requirements.txt
 # 4. Run uvicorn: uvicorn backend.app:app --reload
+# 5. Backfill a folder or archive of resumes: python -m backend.bulk_ingest path/to/resumes --dry-run
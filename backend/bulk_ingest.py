@@ -0,0 +1,141 @@
+"""
+Bulk resume ingestion for backfills.
+
+Walks a directory or a zip/tar archive of PDF resumes and runs each one through
+the same screening workflow as POST /upload_resume, in-process, with a pool of
+concurrent workers. Progress is appended to a checkpoint file so an interrupted
+run picks up where it stopped.
+
+Usage (from the project root):
+    python -m backend.bulk_ingest path/to/resumes/ --workers 8
+    python -m backend.bulk_ingest resumes.zip --dry-run
+"""
+import argparse
+import asyncio
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from backend.app import screen_resume
+
+
+def iter_resumes(source: Path):
+    """
+    Yields (key, file_bytes) for every PDF in a directory, zip or tar archive.
+    Archives are read member by member so large backfills are never held in memory.
+    """
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                yield str(path.relative_to(source)), path.read_bytes()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                if not member.is_dir() and member.filename.lower().endswith(".pdf"):
+                    yield f"{source.name}:{member.filename}", archive.read(member)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    yield f"{source.name}:{member.name}", archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+
+def load_checkpoint(checkpoint: Path, dry_run: bool = False) -> set:
+    """
+    Returns the keys already screened successfully in an earlier run of the same
+    mode, so a dry run never causes a later real run to skip notifications.
+    """
+    done = set()
+    if checkpoint.exists():
+        with open(checkpoint, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial line from an interrupted write
+                if entry.get('status') == 'ok' and entry.get('dry_run', False) == dry_run:
+                    done.add(entry['key'])
+    return done
+
+
+async def ingest(source: Path, checkpoint: Path, workers: int = 4, dry_run: bool = False) -> dict:
+    """
+    Screens every resume under source that is not yet recorded in the checkpoint.
+    Failed files are logged and retried on the next run. Returns run totals.
+    """
+    done = load_checkpoint(checkpoint, dry_run)
+    queue = asyncio.Queue(maxsize=workers * 2)
+    totals = {'ok': 0, 'failed': 0, 'skipped': 0}
+
+    async def worker(log):
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            key, file_bytes = item
+            entry = {'key': key, 'dry_run': dry_run}
+            try:
+                evaluation = await screen_resume(file_bytes, notify=not dry_run)
+                entry.update({
+                    'status': 'ok',
+                    'candidate_id': evaluation.get('candidate_id'),
+                    'finalScore': evaluation.get('finalScore'),
+                })
+                totals['ok'] += 1
+                print(f"✅ {key}: {evaluation.get('finalScore')}")
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                entry.update({'status': 'failed', 'error': error})
+                totals['failed'] += 1
+                print(f"❌ {key}: {error}")
+            log.write(json.dumps(entry) + "\n")
+            log.flush()
+            queue.task_done()
+
+    with open(checkpoint, 'a') as log:
+        tasks = [asyncio.create_task(worker(log)) for _ in range(workers)]
+        # Read files lazily so the bounded queue applies backpressure to the walk
+        for key, file_bytes in iter_resumes(source):
+            if key in done:
+                totals['skipped'] += 1
+                continue
+            await queue.put((key, file_bytes))
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory or archive of PDF resumes in bulk.")
+    parser.add_argument("source", type=Path, help="Directory, .zip or .tar(.gz) archive of PDF resumes")
+    parser.add_argument("--workers", type=int, default=4, help="Number of resumes screened concurrently (default: 4)")
+    parser.add_argument(
+        "--checkpoint", type=Path,
+        help="Progress file used to resume interrupted runs "
+             "(default: <dir>/.checkpoint.jsonl or <archive>.checkpoint.jsonl)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Screen without storing results, sending emails or writing to Google Sheets")
+    args = parser.parse_args(argv)
+
+    if not args.source.exists():
+        parser.error(f"{args.source} does not exist")
+    if args.checkpoint:
+        checkpoint = args.checkpoint
+    elif args.source.is_dir():
+        checkpoint = args.source / ".checkpoint.jsonl"
+    else:
+        checkpoint = args.source.with_name(args.source.name + ".checkpoint.jsonl")
+    totals = asyncio.run(ingest(args.source, checkpoint, max(1, args.workers), args.dry_run))
+    print(f"📊 Done: {totals['ok']} screened, {totals['failed']} failed, {totals['skipped']} already done")
+    return 0 if totals['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
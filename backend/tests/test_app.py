@@ -1,14 +1,544 @@
+import asyncio
+import json
+import zipfile
+from types import SimpleNamespace
+
+import pytest
 from fastapi.testclient import TestClient
 
+import backend.app as app_module
 from backend.app import app
 
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """
+    Routes extraction to "flash" and escalation to "pro", and answers each model
+    with the canned reply in `replies` (a dict, or raw response text).
+    """
+    fake = SimpleNamespace(calls=[], prompts=[], replies={})
+
+    class FakeModel:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+        async def generate_content_async(self, prompt):
+            fake.calls.append(self.model_name)
+            fake.prompts.append(prompt)
+            reply = fake.replies[self.model_name]
+            return SimpleNamespace(text=reply if isinstance(reply, str) else json.dumps(reply))
+
+    monkeypatch.setattr(app_module, "EXTRACTION_MODEL", "flash")
+    monkeypatch.setattr(app_module, "ESCALATION_MODEL", "pro")
+    monkeypatch.setattr(app_module.genai, "GenerativeModel", FakeModel, raising=False)
+    return fake
+
+
+def use_temp_results_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "RESULTS_DB_FILE", str(tmp_path / "results.db"))
+    monkeypatch.setattr(app_module, "_results_db_ready", False)
+
+
+def stub_screening_pipeline(monkeypatch, tmp_path, evaluation, candidate_data=None, job_reqs=None):
+    use_temp_results_db(monkeypatch, tmp_path)
+    sent = []
+    monkeypatch.setattr(app_module, "load_job_requirements", lambda: job_reqs or {"job_title": "Backend Developer"})
+    monkeypatch.setattr(app_module, "extract_text_from_pdf", lambda file_bytes: file_bytes.decode())
+    monkeypatch.setattr(app_module, "send_email", lambda to, subject, body: sent.append((to, subject)) or True)
+    monkeypatch.setattr(app_module, "save_to_google_sheets", lambda data: True)
+
+    async def fake_extract(resume_text):
+        return dict(candidate_data or {"email": "jane@example.com"})
+
+    async def fake_evaluate(data, reqs=None):
+        return dict(evaluation)
+
+    monkeypatch.setattr(app_module, "extract_structured_data", fake_extract)
+    monkeypatch.setattr(app_module, "evaluate_candidate", fake_evaluate)
+    return sent
+
+
 def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
     payload = response.json()
     assert payload["message"].startswith("AI-Powered Resume Screening")
     assert "upload" in payload["endpoints"]
+
+
+def test_extraction_escalates_when_fields_unresolved(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "email": "jane@example.com", "candidateSkills": []}
+    fake_gemini.replies["pro"] = {"name": "Not found", "email": "Not found", "candidateSkills": ["Python"]}
+
+    result = asyncio.run(app_module.extract_structured_data("resume"))
+
+    assert fake_gemini.calls == ["flash", "pro"]
+    assert result["candidateSkills"] == ["Python"]
+    assert result["email"] == "jane@example.com"
+    assert result["name"] == "Jane Doe"
+
+
+def test_extraction_escalates_when_reply_is_not_an_object(fake_gemini):
+    fake_gemini.replies["flash"] = '["Python"]'
+    fake_gemini.replies["pro"] = {"name": "Jane Doe", "candidateSkills": ["Python"]}
+
+    result = asyncio.run(app_module.extract_structured_data("resume"))
+
+    assert fake_gemini.calls == ["flash", "pro"]
+    assert result["candidateSkills"] == ["Python"]
+
+
+def test_extraction_does_not_escalate_for_missing_email(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "email": "Not found", "candidateSkills": ["Python"]}
+
+    asyncio.run(app_module.extract_structured_data("resume"))
+
+    assert fake_gemini.calls == ["flash"]
+
+
+def test_extraction_stays_on_cheap_model_when_valid(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "email": "jane@example.com", "candidateSkills": ["Python"]}
+
+    asyncio.run(app_module.extract_structured_data("resume"))
+
+    assert fake_gemini.calls == ["flash"]
+
+
+def test_local_extraction_resolves_contact_and_experience():
+    resume_text = "\n".join([
+        "Jane Doe",
+        "jane.doe@example.com | +1 555-123-4567",
+        "Software Engineer, Acme  Jan 2019 - Jan 2021",
+        "Senior Engineer, Initech  Jan 2021 - Jul 2022",
+        "B.Tech in Computer Science, XYZ University  2014 - 2018",
+    ])
+
+    fields = app_module.extract_local_fields(resume_text)
+
+    assert fields["name"] == "Jane Doe"
+    assert fields["email"] == "jane.doe@example.com"
+    assert fields["phone"] == "+1 555-123-4567"
+    assert fields["experience"] == "Not found"
+    assert fields["experience_estimate"] == "3.5 years"
+    assert fields["education"].startswith("B.Tech")
+
+
+def test_local_extraction_ignores_titles_certifications_and_years():
+    from datetime import datetime
+
+    assert app_module.extract_local_name("Senior Software Engineer\nJane Doe\njane@example.com") == "Jane Doe"
+    assert app_module.extract_local_name("Career Objective\nJohn Smith") == "Not found"
+
+    resume_text = "Certified Scrum Master, Acme  Jan 2018 - Jan 2023\nB.Sc Computer Science"
+    assert app_module.extract_local_education(resume_text) == "B.Sc Computer Science"
+    assert app_module.estimate_experience_from_dates(resume_text, datetime(2026, 1, 1)) == "5 years"
+    assert app_module.extract_local_education("I am responsible to be. on time") == "Not found"
+
+    assert app_module.extract_local_phone("2019 2020 2021") == "Not found"
+    assert app_module.extract_local_phone("Mobile: +91 98765 43210") == "+91 98765 43210"
+    assert app_module.parse_resume_date("13/2020", datetime(2026, 1, 1)) is None
+
+
+def test_experience_estimate_skips_dates_on_their_own_line_under_education():
+    from datetime import datetime
+
+    today = datetime(2026, 1, 1)
+    assert app_module.estimate_experience_from_dates("XYZ University\nB.Tech, Computer Science\n2014 - 2018", today) == "Not found"
+    assert app_module.estimate_experience_from_dates("High School Diploma\n2010 - 2014", today) == "Not found"
+
+    resume_text = "\n".join([
+        "Experience",
+        "Engineer, Acme",
+        "Jan 2020 - Jan 2023",
+        "Education",
+        "Springfield",
+        "2014 - 2018",
+        "Projects",
+        "Side project  2023 - 2024",
+    ])
+    assert app_module.estimate_experience_from_dates(resume_text, today) == "4 years"
+    assert app_module.extract_explicit_experience(resume_text) == "Not found"
+    assert app_module.extract_explicit_experience("6+ years of experience in Python") == "6+ years"
+
+
+def test_extraction_passes_experience_estimate_as_hint(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "experience": "2 years", "candidateSkills": ["Python"]}
+    resume_text = "Jane Doe\njane.doe@example.com\nEngineer, Acme  Jan 2020 - Jan 2022"
+
+    result = asyncio.run(app_module.extract_structured_data(resume_text))
+
+    assert '"experience"' in fake_gemini.prompts[0]
+    assert "add up to about 2 years" in fake_gemini.prompts[0]
+    assert result["experience"] == "2 years"
+
+
+def test_extraction_passes_local_name_as_hint(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "candidateSkills": ["Python"]}
+
+    result = asyncio.run(app_module.extract_structured_data("Jane Doe\njane.doe@example.com"))
+
+    assert '"name"' in fake_gemini.prompts[0]
+    assert 'The name may be "Jane Doe"' in fake_gemini.prompts[0]
+    assert result["name"] == "Jane Doe"
+
+
+def test_extraction_prompt_only_asks_for_unresolved_fields(fake_gemini):
+    fake_gemini.replies["flash"] = {"name": "Jane Doe", "candidateSkills": ["Python", "SQL"]}
+    resume_text = "Jane Doe\njane.doe@example.com\n5 years of experience\nBachelor's in CS"
+
+    result = asyncio.run(app_module.extract_structured_data(resume_text))
+
+    assert result["email"] == "jane.doe@example.com"
+    assert result["candidateSkills"] == ["Python", "SQL"]
+    assert '"candidateSkills"' in fake_gemini.prompts[0]
+    assert '"email"' not in fake_gemini.prompts[0]
+
+
+def test_leaderboard_ranks_and_filters_by_skill(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    for name, score, skills in [("Ann", 60, ["Python"]), ("Bob", 85, ["Python", "SQL"]), ("Cy", 40, ["SQL"])]:
+        app_module.save_evaluation(
+            "Backend Developer", {}, {"name": name, "finalScore": score, "matchedSkills": skills},
+        )
+
+    response = client.get("/candidates", params={"job": "Backend Developer", "limit": 2})
+    payload = response.json()
+    assert payload["total"] == 3
+    assert [c["name"] for c in payload["candidates"]] == ["Bob", "Ann"]
+
+    response = client.get("/candidates", params={"job": "Backend Developer", "skill": "sql"})
+    assert [c["name"] for c in response.json()["candidates"]] == ["Bob", "Cy"]
+
+
+def test_export_streams_csv(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    app_module.save_evaluation("Backend Developer", {}, {"name": "Ann", "finalScore": 60})
+
+    response = client.get("/candidates/export", params={"job": "Backend Developer"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("Rank,Name,Email")
+    assert lines[1].startswith("1,Ann,")
+
+
+def test_concurrent_exports_stream_every_row(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    monkeypatch.setattr(app_module, "EXPORT_BATCH_SIZE", 50)
+    for i in range(300):
+        app_module.save_evaluation("Backend Developer", {}, {"name": f"Candidate {i}", "finalScore": i % 100})
+
+    async def read_export():
+        response = await app_module.export_candidates(job="Backend Developer")
+        chunks = []
+        async for chunk in response.body_iterator:
+            chunks.append(chunk if isinstance(chunk, str) else chunk.decode())
+            await asyncio.sleep(0)
+        return "".join(chunks)
+
+    async def run_exports():
+        return await asyncio.gather(*(read_export() for _ in range(10)))
+
+    exports = asyncio.run(run_exports())
+
+    assert all(len(export.strip().splitlines()) == 301 for export in exports)
+
+
+def test_near_duplicate_lookup_matches_lightly_edited_resume(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    monkeypatch.setattr(app_module, "NEAR_DUPLICATE_THRESHOLD", 0.8)
+    original = " ".join(
+        f"Worked on project {i} using Python FastAPI and SQL for client {i * 7}." for i in range(40)
+    )
+    edited = original.replace("client 273", "customer 273")
+    unrelated = " ".join(f"Managed retail store {i} and trained staff team {i * 3}." for i in range(40))
+
+    evaluation_id = app_module.save_evaluation("Backend Developer", {}, {"name": "Ann", "finalScore": 70})
+    app_module.save_signature(evaluation_id, app_module.compute_minhash(original))
+
+    row, similarity = app_module.find_near_duplicate("Backend Developer", app_module.compute_minhash(edited))
+    assert row["id"] == evaluation_id
+    assert similarity >= 0.8
+
+    row, _ = app_module.find_near_duplicate("Backend Developer", app_module.compute_minhash(unrelated))
+    assert row is None
+    row, _ = app_module.find_near_duplicate("Data Analyst", app_module.compute_minhash(edited))
+    assert row is None
+
+
+def test_bulk_ingest_resumes_from_checkpoint(monkeypatch, tmp_path):
+    from backend import bulk_ingest
+
+    source = tmp_path / "resumes.zip"
+    with zipfile.ZipFile(source, "w") as archive:
+        for name in ("a.pdf", "b.pdf", "notes.txt"):
+            archive.writestr(name, b"%PDF " + name.encode())
+    checkpoint = tmp_path / "progress.jsonl"
+    checkpoint.write_text(json.dumps({"key": "resumes.zip:a.pdf", "status": "ok", "dry_run": True}) + "\n")
+    screened = []
+
+    async def fake_screen_resume(file_bytes, notify=True):
+        screened.append((file_bytes, notify))
+        return {"candidate_id": 1, "finalScore": 70}
+
+    monkeypatch.setattr(bulk_ingest, "screen_resume", fake_screen_resume)
+
+    totals = asyncio.run(bulk_ingest.ingest(source, checkpoint, workers=2, dry_run=True))
+
+    assert totals == {"ok": 1, "failed": 0, "skipped": 1}
+    assert screened == [(b"%PDF b.pdf", False)]
+    assert bulk_ingest.load_checkpoint(checkpoint, dry_run=True) == {"resumes.zip:a.pdf", "resumes.zip:b.pdf"}
+    assert bulk_ingest.load_checkpoint(checkpoint, dry_run=False) == set()
+
+
+def test_bulk_ingest_default_checkpoint_for_current_directory(monkeypatch, tmp_path):
+    from backend import bulk_ingest
+
+    monkeypatch.chdir(tmp_path)
+
+    assert bulk_ingest.main(["."]) == 0
+    assert (tmp_path / ".checkpoint.jsonl").exists()
+
+
+def test_dry_run_does_not_suppress_later_real_run(monkeypatch, tmp_path):
+    sent = stub_screening_pipeline(
+        monkeypatch, tmp_path,
+        {"name": "Ann", "email": "ann@example.com", "skillScore": 70, "experienceScore": 70, "educationScore": 70},
+        candidate_data={"email": "ann@example.com"},
+    )
+    resume_text = "ann@example.com " + " ".join(f"Built service {i} with Python." for i in range(30))
+
+    dry = asyncio.run(app_module.screen_resume(resume_text.encode(), notify=False))
+    real = asyncio.run(app_module.screen_resume(resume_text.encode()))
+
+    assert dry["email_sent"] is False
+    assert dry["candidate_id"] is None
+    assert "near_duplicate_of" not in real
+    assert app_module.count_evaluations("Backend Developer") == 1
+    assert sent == [("ann@example.com", "🎉 Congratulations - You're Moving Forward!")]
+
+
+def test_rescore_applies_weight_and_skill_changes_locally():
+    old_reqs = {
+        "required_skills": ["Python", "SQL"],
+        "scoring_weights": {"technical_skills": 70, "experience": 20, "education": 10},
+        "passing_score": 50,
+    }
+    new_reqs = dict(old_reqs, required_skills=["Python", "SQL", "Docker", "Go"],
+                    scoring_weights={"technical_skills": 50, "experience": 40, "education": 10})
+    evaluation = {
+        "candidateSkills": ["python", "SQL", "Docker"],
+        "skillScore": 100, "experienceScore": 50, "educationScore": 100, "finalScore": 90,
+    }
+
+    rescored, changes, needs_llm = app_module.rescore_evaluation(evaluation, old_reqs, new_reqs)
+
+    assert changes == {"weights", "skills"}
+    assert not needs_llm
+    assert rescored["skillScore"] == 75
+    assert rescored["matchedSkills"] == ["Python", "SQL", "Docker"]
+    assert rescored["missingSkills"] == ["Go"]
+    assert rescored["finalScore"] == 67.5
+    assert rescored["passed"]
+
+
+def test_rescore_needs_llm_only_when_outcome_could_flip():
+    old_reqs = {"minimum_experience_years": 2, "passing_score": 50}
+    new_reqs = {"minimum_experience_years": 5, "passing_score": 50}
+    strong = {"skillScore": 100, "experienceScore": 100, "educationScore": 100}
+    borderline = {"skillScore": 60, "experienceScore": 50, "educationScore": 50}
+
+    assert app_module.rescore_evaluation(strong, old_reqs, new_reqs)[2] is False
+    assert app_module.rescore_evaluation(borderline, old_reqs, new_reqs)[2] is True
+
+
+def test_rescore_stored_evaluations_skips_llm_for_threshold_change(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    reqs = {"job_title": "Backend Developer", "passing_score": 50}
+    evaluation = {"name": "Ann", "skillScore": 60, "experienceScore": 60, "educationScore": 60, "finalScore": 60}
+    evaluation_id = app_module.save_evaluation("Backend Developer", {}, evaluation, requirements=reqs)
+
+    async def fail_evaluate(candidate_data, job_reqs=None):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(app_module, "evaluate_candidate", fail_evaluate)
+
+    totals = asyncio.run(app_module.rescore_stored_evaluations(dict(reqs, passing_score=70)))
+
+    assert totals["rescored_locally"] == 1
+    assert totals["outcome_changed"] == 1
+    row = next(app_module.query_evaluations("Backend Developer"))
+    assert row["id"] == evaluation_id
+    assert json.loads(row["evaluation"])["passed"] is False
+
+
+def test_admission_control_queues_then_rejects_when_saturated():
+    async def scenario():
+        controller = app_module.AdmissionController(
+            max_in_flight=1, max_queued=1, queue_timeout=0.05, retry_after=7,
+        )
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+
+        try:
+            await controller.acquire()
+        except app_module.HTTPException as e:
+            assert e.status_code == 429
+            assert e.headers == {"Retry-After": "7"}
+        else:
+            raise AssertionError("expected queue-full rejection")
+
+        try:
+            await waiter
+        except app_module.HTTPException as e:
+            assert e.status_code == 503
+        else:
+            raise AssertionError("expected queue timeout")
+
+        controller.release()
+        await controller.acquire()
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2
+    assert stats["rejected_queue_full"] == 1
+    assert stats["rejected_timeout"] == 1
+    assert stats["in_flight"] == 1
+    assert stats["queued"] == 0
+
+
+def test_admission_control_counts_simultaneous_arrivals():
+    async def scenario():
+        controller = app_module.AdmissionController(
+            max_in_flight=1, max_queued=2, queue_timeout=0.2, retry_after=1,
+        )
+
+        async def screen():
+            await controller.acquire()
+            await asyncio.sleep(0.01)
+            controller.release()
+
+        results = await asyncio.gather(*(screen() for _ in range(30)), return_exceptions=True)
+        return [getattr(result, "status_code", None) for result in results], controller.stats()
+
+    statuses, stats = asyncio.run(scenario())
+    assert statuses.count(None) == 3
+    assert statuses.count(429) == 27
+    assert stats["rejected_timeout"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["queued"] == 0
+
+
+def test_admission_stats_endpoint():
+    response = client.get("/admission")
+    assert response.status_code == 200
+    assert {"in_flight", "queued", "rejected_queue_full", "rejected_timeout"} <= response.json().keys()
+
+
+def test_screen_resume_stores_extracted_email_fallback(monkeypatch, tmp_path):
+    sent = stub_screening_pipeline(
+        monkeypatch, tmp_path, {"name": "Jane", "email": "Not found", "finalScore": 70},
+    )
+
+    result = asyncio.run(app_module.screen_resume(b"Jane resume text"))
+
+    row = next(app_module.query_evaluations("Backend Developer"))
+    assert row["email"] == "jane@example.com"
+    assert json.loads(row["evaluation"])["email"] == "jane@example.com"
+    assert result["email_recipient"] == "jane@example.com"
+    assert sent[0][0] == "jane@example.com"
+
+
+def test_near_duplicate_reused_only_for_same_candidate(monkeypatch, tmp_path):
+    sent = stub_screening_pipeline(
+        monkeypatch, tmp_path, {"name": "Bob", "email": "bob@example.com", "finalScore": 40},
+    )
+    monkeypatch.setattr(app_module, "NEAR_DUPLICATE_THRESHOLD", 0.8)
+    body = " ".join(f"Worked on project {i} using Python FastAPI and SQL for client {i * 7}." for i in range(40))
+    prior_id = app_module.save_evaluation(
+        "Backend Developer", {}, {"name": "Ann", "email": "ann@example.com", "finalScore": 70},
+    )
+    app_module.save_signature(prior_id, app_module.compute_minhash(f"ann@example.com {body}"))
+
+    reused = asyncio.run(app_module.screen_resume(f"ann@example.com {body}".encode()))
+    assert reused["candidate_id"] == prior_id
+    assert reused["name"] == "Ann"
+    assert sent == []
+
+    flagged = asyncio.run(app_module.screen_resume(f"bob@example.com {body}".encode()))
+    assert flagged["near_duplicate_of"] == prior_id
+    assert flagged["candidate_id"] != prior_id
+    assert flagged["name"] == "Bob"
+    assert sent[0][0] == "bob@example.com"
+
+
+def test_screen_resume_applies_configured_weights_and_passing_score(monkeypatch, tmp_path):
+    job_reqs = {
+        "job_title": "Backend Developer",
+        "scoring_weights": {"technical_skills": 50, "experience": 50, "education": 0},
+        "passing_score": 70,
+    }
+    sent = stub_screening_pipeline(
+        monkeypatch, tmp_path,
+        {"email": "ann@example.com", "skillScore": 80, "experienceScore": 40, "educationScore": 100, "finalScore": 90},
+        job_reqs=job_reqs,
+    )
+
+    result = asyncio.run(app_module.screen_resume(b"Ann resume text"))
+
+    assert result["finalScore"] == 60
+    assert result["passed"] is False
+    assert sent[0][1] == "Thank You for Your Application"
+    assert "saved_to_sheets" not in result
+
+
+def test_rescore_reevaluates_concurrently_with_email_fallback(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    monkeypatch.setattr(app_module, "RESCORE_CONCURRENCY", 2)
+    reqs = {"job_title": "Backend Developer", "passing_score": 50}
+    for i in range(5):
+        app_module.save_evaluation(
+            "Backend Developer", {"email": f"c{i}@example.com"}, {"name": "Old", "finalScore": 60},
+        )
+    running, peak, seen_reqs = 0, 0, []
+
+    async def fake_evaluate(candidate_data, job_reqs=None):
+        nonlocal running, peak
+        seen_reqs.append(job_reqs)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"name": "New", "email": "Not found", "skillScore": 80, "experienceScore": 80, "educationScore": 80}
+
+    monkeypatch.setattr(app_module, "evaluate_candidate", fake_evaluate)
+
+    totals = asyncio.run(app_module.rescore_stored_evaluations(reqs))
+
+    assert totals["reevaluated"] == 5
+    assert peak == 2
+    assert seen_reqs == [reqs] * 5
+    rows = list(app_module.query_evaluations("Backend Developer"))
+    assert {row["name"] for row in rows} == {"New"}
+    assert sorted(row["email"] for row in rows) == [f"c{i}@example.com" for i in range(5)]
+
+
+def test_rescore_keeps_stale_requirement_in_snapshot(monkeypatch, tmp_path):
+    use_temp_results_db(monkeypatch, tmp_path)
+    old_reqs = {"job_title": "Backend Developer", "minimum_experience_years": 2, "passing_score": 50}
+    new_reqs = dict(old_reqs, minimum_experience_years=5)
+    evaluation = {"name": "Ann", "skillScore": 100, "experienceScore": 100, "educationScore": 100, "finalScore": 100}
+    app_module.save_evaluation("Backend Developer", {}, evaluation, requirements=old_reqs)
+
+    asyncio.run(app_module.rescore_stored_evaluations(new_reqs))
+
+    row = next(app_module.query_evaluations("Backend Developer"))
+    assert json.loads(row["requirements"])["minimum_experience_years"] == 2
+    assert json.loads(row["evaluation"])["staleComponents"] == ["experienceScore"]
+    assert app_module.diff_requirements(json.loads(row["requirements"]), new_reqs) == {"experience"}